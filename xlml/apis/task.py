@@ -21,6 +21,7 @@ import shlex
 from dags.common.quarantined_tests import QuarantineTests
 from typing import Optional, Tuple, Union
 import airflow
+import attrs
 from airflow.models.taskmixin import DAGNode
 from airflow.utils.task_group import TaskGroup
 from xlml.apis import gcp_config, metric_config, test_config
@@ -258,7 +259,9 @@ class XpkTask(BaseTask):
       new_run_model_cmds = [f"export {run_name_env}={run_name}"]
       for cmd in self.task_test_config.run_model_cmds:
         new_run_model_cmds.append(cmd)
-      self.task_test_config.run_model_cmds = new_run_model_cmds
+      self.task_test_config = attrs.evolve(
+          self.task_test_config, run_model_cmds=new_run_model_cmds
+      )
 
       # Update tensorboard file location
       self.task_metric_config.tensorboard_summary.file_location = (
@@ -44,27 +44,44 @@ When Composer updates to a recent Python version, we can use dataclasses.
 """
 
 import abc
-import json
+import functools
 import os
-import shlex
-from typing import Any, Generic, Iterable, List, Optional, TypeVar
+import sys
+import types
+from typing import Any, Callable, Generic, Iterable, Mapping, Optional, Tuple, TypeVar
 
 import attrs
 import datetime
 from dags.common.vm_resource import TpuVersion, CpuVersion
 
+# Prefix of every rendered setup and test script.
+_SETUP_PREFIX = sys.intern('set -xue')
 
-class Accelerator(abc.ABC):
-  """Represents an ML accelerator."""
 
-  @property
-  @abc.abstractmethod
-  def name(self) -> str:
-    """Name of this ML accelerator."""
-    raise NotImplementedError
+def _intern(value: Any) -> Any:
+  """Interns strings that many configs repeat, e.g. network names.
+
+  Non-string values (such as `None`) are returned unchanged.
+  """
+  return sys.intern(value) if isinstance(value, str) else value
 
 
-@attrs.define
+class Accelerator:
+  """Represents an ML accelerator.
+
+  Subclasses set `name` when they are constructed.
+
+  Attributes:
+    name: Name of this ML accelerator.
+  """
+
+  # Keep subclass instances free of `__dict__` so that attrs slots apply.
+  __slots__ = ()
+
+  name: str
+
+
+@attrs.frozen(eq=False)
 class Tpu(Accelerator):
   """Represents a single Cloud TPU instance.
 
@@ -76,23 +93,23 @@ class Tpu(Accelerator):
     network: The network that a TPU will be a part of.
     subnetwork: The subnetwork that a TPU will be a part of.
     reserved: The flag to define if a TPU is a Cloud reservation.
+    name: Name of this TPU type in the Cloud TPU API (e.g. 'v4-8').
   """
 
   version: TpuVersion
   cores: int
-  runtime_version: Optional[str] = None
-  network: str = 'default'
-  subnetwork: str = 'default'
+  runtime_version: Optional[str] = attrs.field(default=None, converter=_intern)
+  network: str = attrs.field(default='default', converter=_intern)
+  subnetwork: str = attrs.field(default='default', converter=_intern)
   reserved: bool = False
   preemptible: bool = False
+  name: str = attrs.field(init=False, repr=False)
 
-  @property
-  def name(self):
-    """Name of this TPU type in the Cloud TPU API (e.g. 'v4-8')."""
-    return f'v{self.version.value}-{self.cores}'
+  def __attrs_post_init__(self):
+    object.__setattr__(self, 'name', f'v{self.version.value}-{self.cores}')
 
 
-@attrs.define
+@attrs.frozen(eq=False)
 class Gpu(Accelerator):
   """Represents a single Cloud GPU instance.
 
@@ -106,48 +123,52 @@ class Gpu(Accelerator):
     subnetwork: The subnetwork that a GPU will be a part of.
     use_local_ssd: Whether to attach local ssd.
     disk_size_gb: size of the new disk in gigabytes.
+    name: Name of this GPU type in the Cloud GPU API (e.g. 'a2-highgpu-1g').
   """
 
   machine_type: str
   image_family: str
   count: int
   accelerator_type: str
-  runtime_version: Optional[str] = None
-  network: Optional[str] = None
-  subnetwork: Optional[str] = None
+  runtime_version: Optional[str] = attrs.field(default=None, converter=_intern)
+  network: Optional[str] = attrs.field(default=None, converter=_intern)
+  subnetwork: Optional[str] = attrs.field(default=None, converter=_intern)
   attach_local_ssd: bool = False
   disk_size_gb: int = 100
+  name: str = attrs.field(init=False, repr=False)
 
-  @property
-  def name(self):
-    """Name of this GPU type in the Cloud GPU API (e.g. 'a2-highgpu-1g')."""
-    return self.accelerator_type
+  def __attrs_post_init__(self):
+    object.__setattr__(self, 'name', self.accelerator_type)
 
 
-@attrs.define
+@attrs.frozen(eq=False)
 class Cpu(Accelerator):
   """Represents a single Cloud CPU instance.
 
   Attributes:
     device_type: CPU device type. E.g., `m1-megamem-96-1` or `n2-standard-64-1`.
+    name: Name of this CPU type (e.g. 'n2-standard-64-1').
   """
 
   device_type: CpuVersion
   machine_count: int
+  name: str = attrs.field(init=False, repr=False)
 
-  @property
-  def name(self):
-    """Name of this CPU type (e.g. 'n2-standard-64-1')."""
-    return f'{self.device_type.value}-{self.machine_count}'
+  def __attrs_post_init__(self):
+    object.__setattr__(
+        self, 'name', f'{self.device_type.value}-{self.machine_count}'
+    )
 
 
 A = TypeVar('A', bound=Accelerator)
 
 
-@attrs.define
+@attrs.frozen(eq=False)
 class TestConfig(abc.ABC, Generic[A]):
   """Base class for end-to-end test configurations.
 
+  Configs are immutable and, like accelerators, compare by identity.
+
   Attributes:
     accelerator: Accelerator type required for this test.
     timeout: Test timeout.
@@ -159,31 +180,59 @@ class TestConfig(abc.ABC, Generic[A]):
   timeout: Optional[datetime.timedelta] = attrs.field(
       default=None, kw_only=True
   )
-  task_owner: str = attrs.field(default='unowned', kw_only=True)
-  gcs_subfolder: str = attrs.field(default='unowned', kw_only=True)
+  task_owner: str = attrs.field(
+      default='unowned', kw_only=True, converter=_intern
+  )
+  gcs_subfolder: str = attrs.field(
+      default='unowned', kw_only=True, converter=_intern
+  )
+
+  # Rendered once per config by `__attrs_post_init__`, since DAG parsing and
+  # task rendering read them many times.
+  _benchmark_id: str = attrs.field(init=False, repr=False)
+  _setup_script: Optional[str] = attrs.field(
+      default=None, init=False, repr=False
+  )
+  _test_script: str = attrs.field(init=False, repr=False)
 
-  @property
   @abc.abstractmethod
+  def __attrs_post_init__(self):
+    """Renders `benchmark_id`, `setup_script` and `test_script`.
+
+    Implementations must call `_set_rendered`.
+    """
+    raise NotImplementedError()
+
+  def _set_rendered(
+      self,
+      benchmark_id: str,
+      setup_script: Optional[str],
+      test_script: str,
+  ):
+    object.__setattr__(self, '_benchmark_id', benchmark_id)
+    object.__setattr__(self, '_setup_script', setup_script)
+    object.__setattr__(self, '_test_script', test_script)
+
+  @property
   def benchmark_id(self) -> str:
     """Unique key for metrics generated by this test."""
-    raise NotImplementedError()
+    return self._benchmark_id
 
   @property
   def setup_script(self) -> Optional[str]:
     """Optional script to run once when the accelerator is created."""
-    return None
+    return self._setup_script
 
   @property
-  @abc.abstractmethod
   def test_script(self) -> str:
     """Script to run on accelerator machine.
 
     The exit code of this script will be the test result.
     """
-    raise NotImplementedError()
+    return self._test_script
 
 
-@attrs.define
+@attrs.frozen(eq=False)
 class TpuVmTest(TestConfig[Tpu]):
   """Test config that runs on a single Cloud TPU VM instance.
 
@@ -195,28 +244,28 @@ class TpuVmTest(TestConfig[Tpu]):
   """
 
   test_name: str
-  set_up_cmds: Iterable[str]
-  run_model_cmds: Iterable[str]
-  num_slices: int = attrs.field(default=1, kw_only=True)
+  set_up_cmds: Optional[Tuple[str, ...]] = attrs.field(
+      converter=attrs.converters.optional(tuple)
+  )
+  run_model_cmds: Tuple[str, ...] = attrs.field(converter=tuple)
+  num_slices: int = attrs.field(
+      default=1, kw_only=True, validator=attrs.validators.ge(1)
+  )
 
-  @property
-  def benchmark_id(self) -> str:
-    return (
-        f'{self.test_name}-{self.accelerator.name}'
-        if self.num_slices == 1
-        else f'{self.test_name}-{self.num_slices}x{self.accelerator.name}'
+  def __attrs_post_init__(self):
+    slices = '' if self.num_slices == 1 else f'{self.num_slices}x'
+    self._set_rendered(
+        benchmark_id=f'{self.test_name}-{slices}{self.accelerator.name}',
+        setup_script=(
+            None
+            if self.set_up_cmds is None
+            else '\n'.join((_SETUP_PREFIX,) + self.set_up_cmds)
+        ),
+        test_script='\n'.join((_SETUP_PREFIX,) + self.run_model_cmds),
     )
 
-  @property
-  def setup_script(self) -> Optional[str]:
-    return '\n'.join(('set -xue', *self.set_up_cmds))
-
-  @property
-  def test_script(self) -> str:
-    return '\n'.join(('set -xue', *self.run_model_cmds))
 
-
-@attrs.define
+@attrs.frozen(eq=False)
 class GpuVmTest(TestConfig[Gpu]):
   """Test config that runs on a single Cloud GPU VM instance.
 
@@ -228,24 +277,25 @@ class GpuVmTest(TestConfig[Gpu]):
   """
 
   test_name: str
-  set_up_cmds: Iterable[str]
-  run_model_cmds: Iterable[str]
+  set_up_cmds: Optional[Tuple[str, ...]] = attrs.field(
+      converter=attrs.converters.optional(tuple)
+  )
+  run_model_cmds: Tuple[str, ...] = attrs.field(converter=tuple)
   use_existing_instance: bool
 
-  @property
-  def benchmark_id(self) -> str:
-    return f'{self.test_name}-{self.accelerator.name}'
-
-  @property
-  def setup_script(self) -> Optional[str]:
-    return '\n'.join(('set -xue', *self.set_up_cmds))
-
-  @property
-  def test_script(self) -> str:
-    return '\n'.join(('set -xue', *self.run_model_cmds))
+  def __attrs_post_init__(self):
+    self._set_rendered(
+        benchmark_id=f'{self.test_name}-{self.accelerator.name}',
+        setup_script=(
+            None
+            if self.set_up_cmds is None
+            else '\n'.join((_SETUP_PREFIX,) + self.set_up_cmds)
+        ),
+        test_script='\n'.join((_SETUP_PREFIX,) + self.run_model_cmds),
+    )
 
 
-@attrs.define
+@attrs.frozen(eq=False)
 class CpuGkeTest(TestConfig[Cpu]):
   """Test config that runs on a single Cloud CPU instance in GKE cluster.
 
@@ -262,25 +312,28 @@ class CpuGkeTest(TestConfig[Cpu]):
   test_name: str
   cluster_name: str
   docker_image: str
-  set_up_cmds: Iterable[str]
-  run_model_cmds: Iterable[str]
+  set_up_cmds: Optional[Tuple[str, ...]] = attrs.field(
+      converter=attrs.converters.optional(tuple)
+  )
+  run_model_cmds: Tuple[str, ...] = attrs.field(converter=tuple)
   startup_time_out_in_sec: int = attrs.field(default=300, kw_only=True)
-  num_slices: int = attrs.field(default=1, kw_only=True)
-
-  @property
-  def benchmark_id(self) -> str:
-    return f'{self.test_name}-{self.accelerator.name}'
-
-  @property
-  def setup_script(self) -> Optional[str]:
-    return ';'.join(('set -xue', *self.set_up_cmds))
+  num_slices: int = attrs.field(
+      default=1, kw_only=True, validator=attrs.validators.ge(1)
+  )
 
-  @property
-  def test_script(self) -> str:
-    return ';'.join(('set -xue', *self.run_model_cmds))
+  def __attrs_post_init__(self):
+    self._set_rendered(
+        benchmark_id=f'{self.test_name}-{self.accelerator.name}',
+        setup_script=(
+            None
+            if self.set_up_cmds is None
+            else ';'.join((_SETUP_PREFIX,) + self.set_up_cmds)
+        ),
+        test_script=';'.join((_SETUP_PREFIX,) + self.run_model_cmds),
+    )
 
 
-@attrs.define
+@attrs.frozen(eq=False)
 class TpuGkeTest(TestConfig[Tpu]):
   """Test config that runs on a single Cloud TPU instance in GKE cluster.
 
@@ -297,41 +350,84 @@ class TpuGkeTest(TestConfig[Tpu]):
   test_name: str
   cluster_name: str
   docker_image: str
-  set_up_cmds: Iterable[str]
-  run_model_cmds: Iterable[str]
+  set_up_cmds: Optional[Tuple[str, ...]] = attrs.field(
+      converter=attrs.converters.optional(tuple)
+  )
+  run_model_cmds: Tuple[str, ...] = attrs.field(converter=tuple)
   startup_time_out_in_sec: int = attrs.field(default=300, kw_only=True)
-  num_slices: int = attrs.field(default=1, kw_only=True)
+  num_slices: int = attrs.field(
+      default=1, kw_only=True, validator=attrs.validators.ge(1)
+  )
 
-  @property
-  def benchmark_id(self) -> str:
-    return (
-        f'{self.test_name}-{self.accelerator.name}'
-        if self.num_slices == 1
-        else f'{self.test_name}-{self.num_slices}x{self.accelerator.name}'
+  def __attrs_post_init__(self):
+    slices = '' if self.num_slices == 1 else f'{self.num_slices}x'
+    self._set_rendered(
+        benchmark_id=f'{self.test_name}-{slices}{self.accelerator.name}',
+        setup_script=(
+            None
+            if self.set_up_cmds is None
+            else ';'.join((_SETUP_PREFIX,) + self.set_up_cmds)
+        ),
+        test_script=';'.join((_SETUP_PREFIX,) + self.run_model_cmds),
     )
 
-  @property
-  def setup_script(self) -> Optional[str]:
-    return ';'.join(('set -xue', *self.set_up_cmds))
 
-  @property
-  def test_script(self) -> str:
-    return ';'.join(('set -xue', *self.run_model_cmds))
+@functools.lru_cache(maxsize=32)
+def _tpu_version(version: str, variant: str) -> TpuVersion:
+  """Looks up the `TpuVersion` for a JSonnet accelerator version and variant."""
+  return TpuVersion(version + variant)
+
+
+# Set by the Composer environment or the local scripts before Airflow starts.
+_COMPILED_JSONNET_DIR = os.environ.get(
+    'XLMLTEST_CONFIGS', '/home/airflow/gcs/dags/dags/jsonnet'
+)
+
+
+def _freeze(value: Any) -> Any:
+  """Recursively converts parsed JSON into read-only mappings and tuples."""
+  if isinstance(value, dict):
+    return types.MappingProxyType({k: _freeze(v) for k, v in value.items()})
+  if isinstance(value, list):
+    return tuple(_freeze(v) for v in value)
+  return value
+
+
+@functools.lru_cache(maxsize=None)
+def _json_loads_fn() -> Callable[[bytes], Any]:
+  """Returns `orjson.loads` if orjson is installed, else `json.loads`.
+
+  Resolved on first use to keep both out of module import, and cached so that
+  a missing orjson is only looked up once.
+  """
+  try:
+    # pylint: disable-next=import-outside-toplevel
+    import orjson
+  except ImportError:
+    # pylint: disable-next=import-outside-toplevel
+    import json
+
+    return json.loads
+
+  return orjson.loads
 
 
-def _load_compiled_jsonnet(test_name: str) -> Any:
+@functools.lru_cache(maxsize=256)
+def _load_compiled_jsonnet(test_name: str) -> Mapping[str, Any]:
+  """Reads and parses a compiled test config once per process.
+
+  The result is shared between callers, so it is frozen all the way down:
+  objects become read-only mappings and arrays become tuples.
+  """
   # TODO(wcromar): Parse GPU tests too
-  config_dir = os.environ.get(
-      'XLMLTEST_CONFIGS', '/home/airflow/gcs/dags/dags/jsonnet'
-  )
-  test_path = os.path.join(config_dir, test_name)
-  with open(test_path, 'r') as f:
-    test = json.load(f)
+  test_path = os.path.join(_COMPILED_JSONNET_DIR, test_name)
+  with open(test_path, 'rb') as f:
+    test = _json_loads_fn()(f.read())
 
-  return test
+  return _freeze(test)
 
 
-@attrs.define
+@attrs.frozen(eq=False)
 class GpuXpkTest(TestConfig[Gpu]):
   """Test config that runs on a single Cloud GPU instance in GKE cluster.
 
@@ -348,25 +444,26 @@ class GpuXpkTest(TestConfig[Gpu]):
   test_name: str
   cluster_name: str
   docker_image: str
-  set_up_cmds: Iterable[str]
-  run_model_cmds: Iterable[str]
+  set_up_cmds: Optional[Tuple[str, ...]] = attrs.field(
+      converter=attrs.converters.optional(tuple)
+  )
+  run_model_cmds: Tuple[str, ...] = attrs.field(converter=tuple)
   startup_time_out_in_sec: int = attrs.field(default=300, kw_only=True)
-  num_slices: int = attrs.field(default=1, kw_only=True)
-
-  @property
-  def benchmark_id(self) -> str:
-    return f'{self.test_name}-{self.accelerator.name}'
-
-  @property
-  def setup_script(self) -> Optional[str]:
-    return ';'.join(self.set_up_cmds)
+  num_slices: int = attrs.field(
+      default=1, kw_only=True, validator=attrs.validators.ge(1)
+  )
 
-  @property
-  def test_script(self) -> str:
-    return ';'.join(self.run_model_cmds)
+  def __attrs_post_init__(self):
+    self._set_rendered(
+        benchmark_id=f'{self.test_name}-{self.accelerator.name}',
+        setup_script=(
+            None if self.set_up_cmds is None else ';'.join(self.set_up_cmds)
+        ),
+        test_script=';'.join(self.run_model_cmds),
+    )
 
 
-@attrs.define
+@attrs.frozen(eq=False)
 class JSonnetTpuVmTest(TestConfig[Tpu]):
   """Convert legacy JSonnet test configs into a TestConfig.
 
@@ -384,15 +481,15 @@ class JSonnetTpuVmTest(TestConfig[Tpu]):
   test_name: str
   setup: str
   exports: str
-  test_command: List[str]
-  num_slices: int = 1
+  test_command: Tuple[str, ...] = attrs.field(converter=tuple)
+  num_slices: int = attrs.field(default=1, validator=attrs.validators.ge(1))
 
   @staticmethod
   def _from_json_helper(
       test: Any,
       setup: str,
       exports: str,
-      test_command: List[str],
+      test_command: Iterable[str],
       reserved: bool,
       network: str,
       subnetwork: str,
@@ -401,9 +498,9 @@ class JSonnetTpuVmTest(TestConfig[Tpu]):
     return JSonnetTpuVmTest(
         test_name=test['testName'],
         accelerator=Tpu(
-            version=TpuVersion(
-                str(test['accelerator']['version'])
-                + test['accelerator']['variant']
+            version=_tpu_version(
+                str(test['accelerator']['version']),
+                test['accelerator']['variant'],
             ),
             cores=test['accelerator']['size'],
             runtime_version=test['tpuSettings']['softwareVersion'],
@@ -448,12 +545,16 @@ class JSonnetTpuVmTest(TestConfig[Tpu]):
   ):
     """Parses a compiled legacy JSonnet test config from `tests/pytorch`."""
     test = _load_compiled_jsonnet(test_name)
+    tpu_settings = test['tpuSettings']
     return JSonnetTpuVmTest._from_json_helper(
         test,
-        setup=test['tpuSettings']['tpuVmPytorchSetup']
         # HACK: Extra setup assumes a new shell in home directory
-        + '\ncd ~\n' + test['tpuSettings']['tpuVmExtraSetup'],
-        exports=test['tpuSettings']['tpuVmExports'],
+        setup=(
+            f"{tpu_settings['tpuVmPytorchSetup']}\n"
+            'cd ~\n'
+            f"{tpu_settings['tpuVmExtraSetup']}"
+        ),
+        exports=tpu_settings['tpuVmExports'],
         test_command=test['command'],
         reserved=reserved,
         network=network,
@@ -461,25 +562,21 @@ class JSonnetTpuVmTest(TestConfig[Tpu]):
         num_slices=num_slices,
     )
 
-  @property
-  def benchmark_id(self) -> str:
-    return self.test_name
+  def __attrs_post_init__(self):
+    # pylint: disable-next=import-outside-toplevel
+    import shlex
 
-  @property
-  def setup_script(self) -> Optional[str]:
-    return '\n'.join(['set -xue', self.setup])
-
-  # TODO(wcromar): replace configmaps
-  @property
-  def test_script(self) -> str:
-    return '\n'.join([
-        'set -xue',
-        self.exports,
-        ' '.join(shlex.quote(s) for s in self.test_command),
-    ])
+    self._set_rendered(
+        benchmark_id=self.test_name,
+        setup_script='\n'.join([_SETUP_PREFIX, self.setup]),
+        # TODO(wcromar): replace configmaps
+        test_script='\n'.join(
+            [_SETUP_PREFIX, self.exports, shlex.join(self.test_command)]
+        ),
+    )
 
 
-@attrs.define
+@attrs.frozen(eq=False)
 class GpuGkeTest(TestConfig[Gpu]):
   """
   Attributes:
@@ -492,11 +589,11 @@ class GpuGkeTest(TestConfig[Gpu]):
   """
 
   test_name: str
-  entrypoint_script: List[str]
-  test_command: List[str]
+  entrypoint_script: Tuple[str, ...] = attrs.field(converter=tuple)
+  test_command: Tuple[str, ...] = attrs.field(converter=tuple)
   docker_image: str
   num_hosts: int = 1
-  gcs_subfolder: str = '/tmp/'
+  gcs_subfolder: str = attrs.field(default='/tmp/', converter=_intern)
 
   @staticmethod
   def from_pytorch(test_name: str):
@@ -519,14 +616,12 @@ class GpuGkeTest(TestConfig[Gpu]):
         timeout=datetime.timedelta(seconds=test['timeout']),
     )
 
-  @property
-  def benchmark_id(self) -> str:
-    return f'{self.test_name}-{self.accelerator.name}'
-
-  @property
-  def setup_script(self) -> str:
-    return shlex.join(self.entrypoint_script)
+  def __attrs_post_init__(self):
+    # pylint: disable-next=import-outside-toplevel
+    import shlex
 
-  @property
-  def test_script(self) -> str:
-    return shlex.join(self.test_command)
+    self._set_rendered(
+        benchmark_id=f'{self.test_name}-{self.accelerator.name}',
+        setup_script=shlex.join(self.entrypoint_script),
+        test_script=shlex.join(self.test_command),
+    )
@@ -0,0 +1,149 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for test_config.py."""
+
+import json
+import sys
+from unittest import mock
+from absl import flags
+from absl.testing import absltest
+import attrs
+from xlml.apis import test_config
+from dags.common.vm_resource import TpuVersion
+
+
+class TestConfigTest(absltest.TestCase):
+
+  def setUp(self):
+    super().setUp()
+    self.tpu = test_config.Tpu(version=TpuVersion.V4, cores=8)
+    self.gpu = test_config.Gpu(
+        machine_type="a3-highgpu-8g",
+        image_family="n/a",
+        count=8,
+        accelerator_type="h100",
+    )
+
+  def test_tpu_gke_test_without_set_up_cmds(self):
+    config = test_config.TpuGkeTest(
+        self.tpu,
+        test_name="test",
+        cluster_name="cluster",
+        docker_image="image",
+        set_up_cmds=None,
+        run_model_cmds=["echo 1", "echo 2"],
+    )
+
+    self.assertIsNone(config.set_up_cmds)
+    self.assertIsNone(config.setup_script)
+    self.assertEqual(config.test_script, "set -xue;echo 1;echo 2")
+
+  def test_gpu_xpk_test_without_set_up_cmds(self):
+    config = test_config.GpuXpkTest(
+        self.gpu,
+        test_name="test",
+        cluster_name="cluster",
+        docker_image="image",
+        set_up_cmds=None,
+        run_model_cmds=["echo 1", "echo 2"],
+    )
+
+    self.assertIsNone(config.set_up_cmds)
+    self.assertIsNone(config.setup_script)
+    self.assertEqual(config.test_script, "echo 1;echo 2")
+
+  def test_evolve_with_run_name_rerenders_test_script(self):
+    config = test_config.GpuXpkTest(
+        self.gpu,
+        test_name="test",
+        cluster_name="cluster",
+        docker_image="image",
+        set_up_cmds=None,
+        run_model_cmds=["echo 1"],
+    )
+
+    # Same update as `XpkTask.run_with_run_name_generation`.
+    updated = attrs.evolve(
+        config,
+        run_model_cmds=["export M_RUN_NAME=run", *config.run_model_cmds],
+    )
+
+    self.assertEqual(updated.test_script, "export M_RUN_NAME=run;echo 1")
+    self.assertEqual(list(config.run_model_cmds), ["echo 1"])
+    self.assertEqual(config.test_script, "echo 1")
+
+  def get_tempdir(self):
+    try:
+      flags.FLAGS.test_tmpdir
+    except flags.UnparsedFlagAccessError:
+      flags.FLAGS(sys.argv)
+    return self.create_tempdir()
+
+  def test_load_compiled_jsonnet_is_cached_and_read_only(self):
+    # pylint: disable=protected-access
+    config_dir = self.get_tempdir()
+    config_dir.create_file(
+        "test.json",
+        content=json.dumps({"accelerator": {"size": 8}, "command": ["ls"]}),
+    )
+    test_config._load_compiled_jsonnet.cache_clear()
+    self.addCleanup(test_config._load_compiled_jsonnet.cache_clear)
+
+    with mock.patch.object(
+        test_config, "_COMPILED_JSONNET_DIR", config_dir.full_path
+    ):
+      first = test_config._load_compiled_jsonnet("test.json")
+      second = test_config._load_compiled_jsonnet("test.json")
+
+    self.assertIs(first, second)
+    self.assertEqual(first["command"], ("ls",))
+    with self.assertRaises(TypeError):
+      first["accelerator"]["size"] = 16
+
+  def test_benchmark_id_with_multiple_slices(self):
+    single_slice = test_config.TpuGkeTest(
+        self.tpu,
+        test_name="test",
+        cluster_name="cluster",
+        docker_image="image",
+        set_up_cmds=None,
+        run_model_cmds=[],
+    )
+    multi_slice = test_config.TpuGkeTest(
+        self.tpu,
+        test_name="test",
+        cluster_name="cluster",
+        docker_image="image",
+        set_up_cmds=None,
+        run_model_cmds=[],
+        num_slices=2,
+    )
+
+    self.assertEqual(single_slice.benchmark_id, "test-v4-8")
+    self.assertEqual(multi_slice.benchmark_id, "test-2xv4-8")
+
+  def test_num_slices_must_be_positive(self):
+    with self.assertRaises(ValueError):
+      test_config.TpuVmTest(
+          self.tpu,
+          test_name="test",
+          set_up_cmds=[],
+          run_model_cmds=[],
+          num_slices=0,
+      )
+
+
+if __name__ == "__main__":
+  absltest.main()